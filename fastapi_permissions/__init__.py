@@ -50,8 +50,11 @@ extremely simple and incomplete example:
 
 __version__ = "0.2.7"
 
+import sys
+import inspect
+import weakref
 import functools
-import itertools
+import collections
 from typing import Any
 
 from fastapi import Depends, HTTPException
@@ -62,8 +65,9 @@ from starlette.status import HTTP_403_FORBIDDEN
 Allow = "Allow"  # acl "allow" action
 Deny = "Deny"  # acl "deny" action
 
-Everyone = "system:everyone"  # user principal for everyone
-Authenticated = "system:authenticated"  # authenticated user principal
+# strings with a colon are not interned by python automatically
+Everyone = sys.intern("system:everyone")  # user principal for everyone
+Authenticated = sys.intern("system:authenticated")  # authenticated principal
 
 
 class _AllPermissions:
@@ -74,7 +78,12 @@ class _AllPermissions:
     """
 
     def __contains__(self, other):
-        """ returns alway true any permission """
+        """ returns alway true any permission
+
+        The permission checks compare against the "All" constant by identity
+        and don't call this method, it is kept for "permission in All" checks
+        outside of this module.
+        """
         return True
 
     def __str__(self):
@@ -109,16 +118,44 @@ def configure_permissions(
     permission_exception:
         the exception used if a permission is denied
 
-    returns: permission_dependency_factory function,
+    returns: PermissionFactory instance, calling permission_dependency_factory
              with some parameters already provisioned
     """
     active_principals_func = Depends(active_principals_func)
 
-    return functools.partial(
-        permission_dependency_factory,
-        active_principals_func=active_principals_func,
-        permission_exception=permission_exception,
-    )
+    return PermissionFactory(active_principals_func, permission_exception)
+
+
+class PermissionFactory:
+    """ creates permission dependencies with a provisioned configuration
+
+    An instance is returned by "configure_permissions()" and provides the
+    active principals dependency and the permission exception to the
+    "permission_dependency_factory()" function.
+    """
+
+    __slots__ = ("active_principals_func", "permission_exception")
+
+    def __init__(
+        self, active_principals_func: Any, permission_exception: HTTPException
+    ):
+        self.active_principals_func = active_principals_func
+        self.permission_exception = permission_exception
+
+    def __call__(self, permission: str, resource: Any):
+        """ returns a dependable for checking a permission on a resource
+
+        permission:
+            the permission to check
+        resource:
+            the resource that will be accessed
+        """
+        return permission_dependency_factory(
+            permission,
+            resource,
+            self.active_principals_func,
+            self.permission_exception,
+        )
 
 
 def permission_dependency_factory(
@@ -130,8 +167,8 @@ def permission_dependency_factory(
     """ returns a function that acts as a dependable for checking permissions
 
     This is the actual function used for creating the permission dependency,
-    with the help of fucntools.partial in the "configure_permissions()"
-    function.
+    with the help of the PermissionFactory returned by the
+    "configure_permissions()" function.
 
     permission:
         the permission to check
@@ -144,22 +181,76 @@ def permission_dependency_factory(
 
     returns: dependency function for "Depends()"
     """
+    _warm_up_acl(resource)
+
     if callable(resource):
-        dependable_resource = Depends(resource)
+        permission_dependency = _PermissionChecker(
+            permission,
+            permission_exception,
+            resource=Depends(resource),
+            principals=active_principals_func,
+        )
     else:
-        dependable_resource = Depends(lambda: resource)
+        # a resource that is not callable doesn't need to be resolved by
+        # FastAPI on every request
+        permission_dependency = _StaticPermissionChecker(
+            permission,
+            permission_exception,
+            resource,
+            principals=active_principals_func,
+        )
+    return Depends(permission_dependency)
 
-    # to get the caller signature right, we need to add only the resource and
-    # user dependable in the definition
-    # the permission itself is available through the outer function scope
-    def permission_dependency(
-        resource=dependable_resource, principals=active_principals_func
-    ):
-        if has_permission(principals, permission, resource):
+
+class _PermissionChecker:
+    """ the dependable created by permission_dependency_factory()
+
+    to get the caller signature right, only the resource and user dependable
+    are exposed via the "__signature__" attribute, the permission and the
+    exception are stored on the instance.
+    """
+
+    __slots__ = ("permission", "permission_exception", "__signature__")
+
+    def __init__(self, permission, permission_exception, **dependables):
+        self.permission = permission
+        self.permission_exception = permission_exception
+        self.__signature__ = inspect.Signature(
+            [
+                inspect.Parameter(
+                    name,
+                    inspect.Parameter.POSITIONAL_OR_KEYWORD,
+                    default=dependable,
+                )
+                for name, dependable in dependables.items()
+            ]
+        )
+
+    def __call__(self, resource, principals):
+        if has_permission(principals, self.permission, resource):
             return resource
-        raise permission_exception
+        raise self.permission_exception
 
-    return Depends(permission_dependency)
+
+class _StaticPermissionChecker(_PermissionChecker):
+    """ the dependable for a resource that is not callable
+
+    The resource is stored on the instance and only the user dependable is
+    exposed via the "__signature__" attribute.
+    """
+
+    __slots__ = ("resource",)
+
+    def __init__(
+        self, permission, permission_exception, resource, **dependables
+    ):
+        super().__init__(permission, permission_exception, **dependables)
+        self.resource = resource
+
+    def __call__(self, principals):
+        if has_permission(principals, self.permission, self.resource):
+            return self.resource
+        raise self.permission_exception
 
 
 def has_permission(
@@ -175,14 +266,36 @@ def has_permission(
 
     returns bool: permission granted or denied
     """
+    principals_set = as_principals_set(user_principals)
     acl = normalize_acl(resource)
 
+    compiled = None
+    if type(acl) is tuple and acl is not resource:
+        compiled = _precompiled_acl(acl, type(resource))
+    if compiled is not None and compiled.index is not None:
+        try:
+            matching = compiled.index.get(
+                requested_permission, compiled.wildcard
+            )
+        except TypeError:
+            # an unhashable permission can only be matched by "All"
+            matching = compiled.wildcard
+        for allowed, principal in matching:
+            if principal in principals_set:
+                return allowed
+        return False
+
     for action, principal, permissions in acl:
-        if isinstance(permissions, str):
-            permissions = {permissions}
-        if requested_permission in permissions:
-            if principal in user_principals:
-                return action == Allow
+        # "All" contains every permission, no need to ask it
+        if permissions is not All:
+            if isinstance(permissions, str):
+                # compare directly instead of creating a one element set
+                if requested_permission != permissions:
+                    continue
+            elif requested_permission not in permissions:
+                continue
+        if principal in principals_set:
+            return action == Allow
     return False
 
 
@@ -195,19 +308,158 @@ def list_permissions(user_principals: list, resource: Any):
     returns dict: every available permission of the resource as key
                   and True / False as value if the permission is granted.
     """
+    principals_set = as_principals_set(user_principals)
     acl = normalize_acl(resource)
+    compiled = None
+    if type(acl) is tuple and acl is not resource:
+        compiled = _precompiled_acl(acl, type(resource))
+    if compiled is None:
+        return _list_permissions(principals_set, _compile_entries(acl))
+
+    # results for precompiled acls are cached, as the same users tend to
+    # request the same resources
+    if type(principals_set) is not frozenset:
+        principals_set = frozenset(principals_set)
+    key = principals_set, id(compiled)
+    cached = _listed_permissions_cache.get(key)
+    if cached is not None:
+        _, listed = cached
+    else:
+        listed = _list_permissions(principals_set, compiled.entries)
+        # keep a reference to the compiled acl, so its id is not reused
+        _remember(
+            _listed_permissions_cache,
+            _LISTED_PERMISSIONS_CACHE_SIZE,
+            key,
+            (compiled, listed),
+        )
+    return dict(listed)
 
-    acl_permissions = (permissions for _, _, permissions in acl)
-    as_iterables = ({p} if not is_like_list(p) else p for p in acl_permissions)
-    permissions = set(itertools.chain.from_iterable(as_iterables))
 
-    return {
-        str(p): has_permission(user_principals, p, acl) for p in permissions
-    }
+def _list_permissions(principals_set, entries):
+    """ lists all permissions of the principals for normalized acl entries
+
+    principals_set: the principals of a user as set or frozenset
+    entries: acl entries normalized by _compile_entries()
+
+    returns dict: see list_permissions()
+    """
+    # the acl is only walked once: the first matching entry decides on a
+    # permission, like in has_permission(). A matching entry for "All" decides
+    # on every permission that is not decided yet, even on the ones that are
+    # only mentioned further down the list.
+    granted = {}
+    undecided = set()
+    wildcard = None
+    for allowed, principal, permissions in entries:
+        is_wildcard = permissions is All
+        if not isinstance(permissions, tuple):
+            permissions = (permissions,)
+        if wildcard is not None:
+            for permission in permissions:
+                granted.setdefault(permission, wildcard)
+        elif principal in principals_set:
+            for permission in permissions:
+                granted.setdefault(permission, allowed)
+            if is_wildcard:
+                wildcard = allowed
+                for permission in undecided:
+                    granted.setdefault(permission, allowed)
+        else:
+            undecided.update(permissions)
+
+    for permission in undecided:
+        granted.setdefault(permission, False)
+    return {str(p): allowed for p, allowed in granted.items()}
+
+
+# acl helper for resources
+
+
+def acl_cached(acl_method):
+    """ decorator for an "__acl__" method, computing the acl once per instance
+
+    An "__acl__" method builds a new list on every permission check. If the
+    acl of a resource only depends on attributes that can't change, the
+    decorated method is only called on the first permission check of an
+    instance and the result is reused afterwards:
+
+        class Item(BaseModel):
+            owner: str
+
+            class Config:
+                allow_mutation = False
+
+            @acl_cached
+            def __acl__(self):
+                return [(Allow, f"user:{self.owner}", "edit")]
+
+    The cached acl is not updated if an attribute changes, so only use this
+    for immutable resources. The acl is cached outside of the instance, so it
+    does not show up in e.g. the serialization of a pydantic model.
+    """
+    return _CachedAcl(acl_method)
+
+
+class _CachedAcl:
+    """ descriptor for an "__acl__" method decorated with "acl_cached" """
+
+    __slots__ = ("acl_method", "cache")
+
+    def __init__(self, acl_method):
+        self.acl_method = acl_method
+        # maps id(instance) to (weak reference to instance, acl)
+        self.cache = {}
+
+    def __get__(self, instance, owner=None):
+        if instance is None:
+            return self
+        return self.acl_for(instance)
+
+    def acl_for(self, instance):
+        """ returns the cached acl for an instance """
+        key = id(instance)
+        try:
+            reference, acl = self.cache[key]
+            if reference() is instance:
+                return acl
+        except KeyError:
+            pass
+
+        acl = self.acl_method(instance)
+        try:
+            reference = weakref.ref(instance, self._forget_callback(key))
+        except TypeError:
+            # instances without weak reference support are not cached
+            return acl
+        self.cache[key] = reference, acl
+        return acl
+
+    def _forget_callback(self, key):
+        """ returns a callback that removes an acl from the cache """
+        cache = self.cache
+
+        def forget(reference):
+            if cache.get(key, (None,))[0] is reference:
+                cache.pop(key, None)
+
+        return forget
 
 
 # utility functions
 
+# precompiled acls by id(acl), the oldest ones are dropped
+_compiled_acl_cache = collections.OrderedDict()
+_COMPILED_ACL_CACHE_SIZE = 128
+
+# results of list_permissions() for precompiled acls by (principals, id)
+_listed_permissions_cache = collections.OrderedDict()
+_LISTED_PERMISSIONS_CACHE_SIZE = 1024
+
+_CompiledAcl = collections.namedtuple(
+    "_CompiledAcl", ["entries", "index", "wildcard"]
+)
+
 
 def normalize_acl(resource: Any):
     """ returns the access controll list for a resource
@@ -229,8 +481,182 @@ def normalize_acl(resource: Any):
     return []
 
 
+def _warm_up_acl(resource: Any):
+    """ precompiles the acl of a resource when a route is defined
+
+    Acls defined as class attributes are precompiled on first use. Doing
+    this upfront moves the work away from the first request.
+
+    A class used as a resource is instantiated by FastAPI via "Depends()", so
+    the acl of the class itself is prepared. For other callables the type of
+    the resource is not known in advance.
+    """
+    if isinstance(resource, type):
+        resource_type = resource
+    elif callable(resource):
+        return
+    else:
+        resource_type = type(resource)
+
+    acl = getattr(resource_type, "__acl__", None)
+    if type(acl) is tuple:
+        try:
+            _precompiled_acl(acl, resource_type)
+        except (TypeError, ValueError):
+            # not a valid acl, this will surface on the permission check
+            pass
+
+
+def _precompiled_acl(acl: tuple, resource_type: type):
+    """ returns the precompiled version of an acl defined as class attribute
+
+    Only tuples are precompiled: they can't be changed in place, so the
+    compiled version stays valid as long as the class uses the same tuple.
+    Acls in a list are scanned as they are on every check, as are acls that
+    are not the "__acl__" attribute of the resource type, like the ones
+    returned by an "__acl__" method.
+
+    returns _CompiledAcl or None if the acl is not precompiled
+    """
+    # the cache keeps a reference to the acl, so its id can't be reused by
+    # another object as long as it is cached
+    cached = _compiled_acl_cache.get(id(acl))
+    if cached is not None and cached[0] is acl:
+        return cached[1]
+    if getattr(resource_type, "__acl__", None) is not acl:
+        return None
+
+    try:
+        # acls with the same entries share the same compiled acl
+        compiled = _compile_acl_content(acl)
+    except TypeError:
+        # unhashable entries, e.g. permissions in a list, may be changed in
+        # place and are not precompiled
+        compiled = None
+    _remember(
+        _compiled_acl_cache, _COMPILED_ACL_CACHE_SIZE, id(acl), (acl, compiled)
+    )
+    return compiled
+
+
+@functools.lru_cache(maxsize=_COMPILED_ACL_CACHE_SIZE)
+def _compile_acl_content(acl_content: tuple):
+    """ precompiles the entries of an acl, cached by their content """
+    return _compile_acl(acl_content)
+
+
+def _remember(cache, maxsize, key, value):
+    """ stores a value in a cache that drops its oldest entries
+
+    cache: an OrderedDict, the oldest entry first
+    maxsize: the number of entries to keep
+
+    Permission checks may run in several threads at once, so only single
+    operations on the cache are used, that don't fail if another thread
+    removed an entry in between.
+    """
+    cache.pop(key, None)
+    cache[key] = value
+    while len(cache) > maxsize:
+        try:
+            cache.popitem(last=False)
+        except KeyError:
+            # emptied by another thread
+            break
+
+
+def _compile_acl(acl):
+    """ precompiles an access controll list for faster permission checks
+
+    Besides the normalized entries, an index is built that maps each
+    permission to the (allowed, principal) pairs of the entries that apply to
+    it, in the order of the acl. Entries for "All" are part of every index
+    entry and are also collected in "wildcard", used for permissions not
+    found in the index.
+
+    If the acl contains permissions that can't be indexed, "index" and
+    "wildcard" are None.
+
+    Principals and permissions are interned, since precompiled acls are kept
+    around: comparing them with interned strings is just a pointer check.
+
+    returns _CompiledAcl: namedtuple of entries, index and wildcard
+    """
+    entries = tuple(
+        (allowed, _interned(principal), _interned(permissions))
+        for allowed, principal, permissions in _compile_entries(acl)
+    )
+    index = {}
+    wildcard = []
+    try:
+        for allowed, principal, permissions in entries:
+            if permissions is All:
+                wildcard.append((allowed, principal))
+                for matching in index.values():
+                    matching.append((allowed, principal))
+            elif isinstance(permissions, tuple):
+                for permission in dict.fromkeys(permissions):
+                    if permission not in index:
+                        index[permission] = list(wildcard)
+                    index[permission].append((allowed, principal))
+            else:
+                return _CompiledAcl(entries, None, None)
+    except TypeError:
+        # unhashable permission
+        return _CompiledAcl(entries, None, None)
+
+    index = {permission: tuple(m) for permission, m in index.items()}
+    return _CompiledAcl(entries, index, tuple(wildcard))
+
+
+def _interned(value):
+    """ interns a string or the strings of a tuple, other values are kept """
+    if type(value) is str:
+        return sys.intern(value)
+    elif type(value) is tuple:
+        return tuple(_interned(item) for item in value)
+    return value
+
+
+def _compile_entries(acl):
+    """ yields the entries of an access controll list in a normalized form
+
+    Every entry is a tuple of (allowed, principal, permissions): "allowed" is a
+    boolean instead of the action string, single permissions are wrapped in a
+    tuple, other iterables converted to one, and "All" is left as it is.
+    """
+    for action, principal, permissions in acl:
+        if permissions is All:
+            pass
+        elif isinstance(permissions, str):
+            permissions = (permissions,)
+        elif is_like_list(permissions):
+            permissions = tuple(permissions)
+        yield action == Allow, principal, permissions
+
+
+def as_principals_set(user_principals):
+    """ returns the principals of a user as a set for fast membership tests
+
+    A set or frozenset is returned unchanged, any other iterable is converted
+    to a frozenset once, instead of scanning it for every acl entry.
+    """
+    if isinstance(user_principals, (set, frozenset)):
+        return user_principals
+    return frozenset(user_principals)
+
+
+# builtin types that are checked first in is_like_list()
+_LIST_TYPES = frozenset({list, tuple, set, frozenset, dict})
+
+
 def is_like_list(something):
     """ checks if something is iterable but not a string """
-    if isinstance(something, str):
+    something_type = type(something)
+    if something_type is str:
+        return False
+    elif something_type in _LIST_TYPES:
+        return True
+    elif isinstance(something, str):
         return False
     return hasattr(something, "__iter__")
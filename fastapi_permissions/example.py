@@ -14,8 +14,9 @@ from fastapi_permissions import (
     Authenticated,
     Deny,
     Everyone,
-    configure_permissions,
     list_permissions,
+    as_principals_set,
+    configure_permissions,
 )
 
 # >>> THIS IS NEW
@@ -180,11 +181,12 @@ class Item(BaseModel):
 
 
 # for resources that don't have a corresponding model in the database
-# a simple class with an "__acl__" property is defined
+# a simple class with an "__acl__" property is defined.
+# an acl defined as a tuple is precompiled for faster permission checks
 
 
 class ItemListResource:
-    __acl__ = [(Allow, Authenticated, "view")]
+    __acl__ = ((Allow, Authenticated, "view"),)
 
 
 # you can even use just a list
@@ -197,15 +199,20 @@ NewItemAcl = [(Deny, "user:bob", "create"), (Allow, Authenticated, "create")]
 # associated principals.
 
 
+# the principals are returned as frozensets, so the permission checks can use
+# them as they are, without converting them to a set for every check.
+
+ANONYMOUS_PRINCIPALS = frozenset({Everyone})
+AUTHENTICATED_PRINCIPALS = frozenset({Everyone, Authenticated})
+
+
 def get_active_principals(user: User = Depends(get_current_user)):
     if user:
         # user is logged in
-        principals = [Everyone, Authenticated]
-        principals.extend(getattr(user, "principals", []))
+        return AUTHENTICATED_PRINCIPALS.union(getattr(user, "principals", []))
     else:
         # user is not logged in
-        principals = [Everyone]
-    return principals
+        return ANONYMOUS_PRINCIPALS
 
 
 # We need to tell the permissions system, how to get the principals of the
@@ -263,8 +270,10 @@ async def show_items(
     ilr: ItemListResource = Permission("view", ItemListResource),
     user=Depends(get_current_user),
 ):
+    # the principals are converted to a set only once for all items
+    principals = as_principals_set(user.principals)
     available_permissions = {
-        index: list_permissions(user.principals, get_item(index))
+        index: list_permissions(principals, get_item(index))
         for index in fake_items_db
     }
     return [
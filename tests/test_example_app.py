@@ -144,4 +144,20 @@ def test_get_active_principals_for_not_logged_in_user():
     from fastapi_permissions.example import Everyone, get_active_principals
 
     result = get_active_principals(None)
-    assert result == [Everyone]
+    assert result == {Everyone}
+
+
+def test_get_active_principals_for_logged_in_user():
+    """ return the correct principals for a logged in user """
+    from fastapi_permissions.example import (
+        User,
+        Everyone,
+        Authenticated,
+        get_active_principals,
+    )
+
+    user = User(username="bob", principals=["user:bob", "role:admin"])
+    result = get_active_principals(user)
+
+    assert result == {Everyone, Authenticated, "user:bob", "role:admin"}
+    assert isinstance(result, frozenset)
@@ -1,9 +1,12 @@
 """ Tests the main api functions """
 
 import inspect
+from types import MappingProxyType
 
 import pytest
 
+import fastapi_permissions as fp
+
 
 def dummy_principal_callable():
     return "dummy principals"
@@ -14,15 +17,17 @@ def dummy_resource_callable():
 
 
 class DummyUser:
-    def __init__(self, principals):
-        from fastapi_permissions import Everyone, Authenticated
+    __slots__ = ("principals", "_repr")
 
-        self.principals = [Everyone] + principals
+    def __init__(self, principals):
         if principals:
-            self.principals.append(Authenticated)
+            self.principals = (fp.Everyone, *principals, fp.Authenticated)
+        else:
+            self.principals = (fp.Everyone,)
+        self._repr = f"<DummyUser({', '.join(self.principals)})>"
 
     def __repr__(self):
-        return self.principals[0]
+        return self._repr
 
 
 dummy_user_john = DummyUser(["user:john", "role:user"])
@@ -31,238 +36,431 @@ dummy_user_alice = DummyUser(["user:alice", "role:admin"])
 dummy_user_bob = DummyUser([])
 
 
-@pytest.fixture
+@pytest.fixture(scope="module")
 def acl_fixture():
-    from fastapi_permissions import All, Deny, Allow, Everyone, Authenticated
-
-    yield [
-        (Allow, "user:john", "view"),
-        (Allow, "user:john", "edit"),
-        (Allow, "user:jane", ("edit", "use")),
-        (Deny, "role:user", "create"),
-        (Allow, "role:moderator", "delete"),
-        (Deny, Authenticated, "copy"),
-        (Allow, "role:admin", All),
-        (Allow, Everyone, "share"),
-        (Allow, "role:moderator", "share"),
+    """ the acl is never changed by the tests, so it is shared """
+    return [
+        (fp.Allow, "user:john", "view"),
+        (fp.Allow, "user:john", "edit"),
+        (fp.Allow, "user:jane", ("edit", "use")),
+        (fp.Deny, "role:user", "create"),
+        (fp.Allow, "role:moderator", "delete"),
+        (fp.Deny, fp.Authenticated, "copy"),
+        (fp.Allow, "role:admin", fp.All),
+        (fp.Allow, fp.Everyone, "share"),
+        (fp.Allow, "role:moderator", "share"),
     ]
 
 
-permission_results = {
-    dummy_user_john: {
-        "view": True,
-        "edit": True,
-        "use": False,
-        "create": False,
-        "delete": False,
-        "share": True,
-        "copy": False,
-        "permissions:*": False,
-    },
-    dummy_user_jane: {
-        "view": False,
-        "edit": True,
-        "use": True,
-        "create": False,
-        "delete": True,
-        "share": True,
-        "copy": False,
-        "permissions:*": False,
-    },
-    dummy_user_alice: {
-        "view": True,
-        "edit": True,
-        "use": True,
-        "create": True,
-        "delete": True,
-        "share": True,
-        "copy": False,
-        "permissions:*": True,
-    },
-    dummy_user_bob: {
-        "view": False,
-        "edit": False,
-        "use": False,
-        "create": False,
-        "delete": False,
-        "share": True,
-        "copy": False,
-        "permissions:*": False,
-    },
-}
+# the principals of the test users with the expected results of
+# list_permissions(), the expected results are read only
+permission_results = [
+    pytest.param(
+        dummy_user_john.principals,
+        MappingProxyType(
+            {
+                "view": True,
+                "edit": True,
+                "use": False,
+                "create": False,
+                "delete": False,
+                "share": True,
+                "copy": False,
+                "permissions:*": False,
+            }
+        ),
+        id=", ".join(dummy_user_john.principals),
+    ),
+    pytest.param(
+        dummy_user_jane.principals,
+        MappingProxyType(
+            {
+                "view": False,
+                "edit": True,
+                "use": True,
+                "create": False,
+                "delete": True,
+                "share": True,
+                "copy": False,
+                "permissions:*": False,
+            }
+        ),
+        id=", ".join(dummy_user_jane.principals),
+    ),
+    pytest.param(
+        dummy_user_alice.principals,
+        MappingProxyType(
+            {
+                "view": True,
+                "edit": True,
+                "use": True,
+                "create": True,
+                "delete": True,
+                "share": True,
+                "copy": False,
+                "permissions:*": True,
+            }
+        ),
+        id=", ".join(dummy_user_alice.principals),
+    ),
+    pytest.param(
+        dummy_user_bob.principals,
+        MappingProxyType(
+            {
+                "view": False,
+                "edit": False,
+                "use": False,
+                "create": False,
+                "delete": False,
+                "share": True,
+                "copy": False,
+                "permissions:*": False,
+            }
+        ),
+        id=", ".join(dummy_user_bob.principals),
+    ),
+]
 
 
 def test_configure_permissions_wraps_principal_callable(mocker):
     """ test if active_principle_funcs parameter is wrapped in "Depends" """
 
-    mocker.patch("fastapi_permissions.Depends")
-
-    from fastapi_permissions import Depends, configure_permissions
+    mocker.patch.object(fp, "Depends")
 
-    configure_permissions(dummy_principal_callable)
+    fp.configure_permissions(dummy_principal_callable)
 
-    assert Depends.call_count == 1
-    assert Depends.call_args == mocker.call(dummy_principal_callable)
+    assert fp.Depends.call_count == 1
+    assert fp.Depends.call_args == mocker.call(dummy_principal_callable)
 
 
 def test_configure_permissions_returns_correct_signature(mocker):
     """ check the return value signature of configure_permissions """
 
-    mocker.patch("fastapi_permissions.Depends")
+    mocker.patch.object(fp, "Depends")
 
-    from fastapi_permissions import (
-        Depends,
-        permission_exception,
-        configure_permissions,
-        permission_dependency_factory,
-    )
-
-    partial_func = configure_permissions(dummy_principal_callable)
-    parameters = inspect.signature(partial_func).parameters
+    factory = fp.configure_permissions(dummy_principal_callable)
+    parameters = inspect.signature(factory).parameters
 
-    assert partial_func.func == permission_dependency_factory
-    assert len(parameters) == 4
+    assert isinstance(factory, fp.PermissionFactory)
+    assert len(parameters) == 2
     assert parameters["permission"].default == inspect.Parameter.empty
     assert parameters["resource"].default == inspect.Parameter.empty
-    assert parameters["active_principals_func"].default == Depends(
-        dummy_principal_callable
-    )
-    assert parameters["permission_exception"].default == permission_exception
+    assert fp.Depends.call_args == mocker.call(dummy_principal_callable)
+    assert factory.active_principals_func == fp.Depends.return_value
+    assert factory.permission_exception == fp.permission_exception
 
 
 def test_configure_permissions_parameters(mocker):
     """ test the configuration options of configure_permissions """
 
-    mocker.patch("fastapi_permissions.Depends")
-
-    from fastapi_permissions import configure_permissions
+    mocker.patch.object(fp, "Depends")
 
-    partial_func = configure_permissions(
+    factory = fp.configure_permissions(
         dummy_principal_callable, permission_exception="exception option"
     )
-    parameters = inspect.signature(partial_func).parameters
 
-    assert parameters["permission_exception"].default == "exception option"
+    assert factory.permission_exception == "exception option"
 
 
-def test_permission_dependency_factory_wraps_callable_resource(mocker):
-    mocker.patch("fastapi_permissions.Depends")
+def test_permission_factory_calls_dependency_factory(mocker):
+    """ the factory provides its configuration to the dependency factory """
+    mocker.patch.object(fp, "permission_dependency_factory")
+
+    factory = fp.PermissionFactory("active_principals_func", "exception")
+    result = factory("view", dummy_resource_callable)
+
+    assert result == fp.permission_dependency_factory.return_value
+    assert fp.permission_dependency_factory.call_args == mocker.call(
+        "view", dummy_resource_callable, "active_principals_func", "exception"
+    )
 
-    from fastapi_permissions import Depends, permission_dependency_factory
 
-    permission_dependency_factory(
+def test_permission_dependency_factory_wraps_callable_resource(mocker):
+    mocker.patch.object(fp, "Depends")
+
+    fp.permission_dependency_factory(
         "view",
         dummy_resource_callable,
         "active_principals_func",
         "permisssion_exception",
     )
 
-    assert Depends.call_count == 2
-    assert Depends.call_args_list[0] == mocker.call(dummy_resource_callable)
+    assert fp.Depends.call_count == 2
+    assert fp.Depends.call_args_list[0] == mocker.call(
+        dummy_resource_callable
+    )
 
 
 def test_permission_dependency_factory_returns_correct_signature(mocker):
-    mocker.patch("fastapi_permissions.Depends")
+    mocker.patch.object(fp, "Depends")
 
-    from fastapi_permissions import Depends, permission_dependency_factory
-
-    permission_func = permission_dependency_factory(
+    permission_func = fp.permission_dependency_factory(
         "view",
         dummy_resource_callable,
         "active_principals_func",
         "permisssion_exception",
     )
 
-    assert Depends.call_count == 2
-    args, kwargs = Depends.call_args_list[1]
+    assert fp.Depends.call_count == 2
+    args, kwargs = fp.Depends.call_args_list[1]
     permission_func = args[0]
     assert callable(permission_func)
 
-    parameters = inspect.signature(permission_func).parameters
-    print(parameters)
+    assert permission_func.permission == "view"
+    assert permission_func.permission_exception == "permisssion_exception"
+    parameters = permission_func.__signature__.parameters
     assert len(parameters) == 2
-    assert parameters["resource"].default == Depends(dummy_resource_callable)
+    assert fp.Depends.call_args_list[0] == mocker.call(
+        dummy_resource_callable
+    )
+    assert parameters["resource"].default == fp.Depends.return_value
     assert parameters["principals"].default == "active_principals_func"
 
 
+def test_permission_dependency_factory_static_resource(mocker):
+    """ a resource that is not callable is not wrapped in "Depends" """
+    mocker.patch.object(fp, "Depends")
+
+    fp.permission_dependency_factory(
+        "view",
+        "dummy resource",
+        "active_principals_func",
+        "permisssion_exception",
+    )
+
+    assert fp.Depends.call_count == 1
+    args, kwargs = fp.Depends.call_args_list[0]
+    permission_func = args[0]
+    assert callable(permission_func)
+
+    assert permission_func.resource == "dummy resource"
+    parameters = permission_func.__signature__.parameters
+    assert len(parameters) == 1
+    assert parameters["principals"].default == "active_principals_func"
+
+
+def test_static_permission_dependency_returns_resource(mocker):
+    """ If a user has a permission, the static resource should be returned """
+    mocker.patch.object(fp, "has_permission", return_value=True)
+    mocker.patch.object(fp, "Depends")
+
+    fp.permission_dependency_factory(
+        "view",
+        "dummy resource",
+        "active_principals_func",
+        "permisssion_exception",
+    )
+    args, kwargs = fp.Depends.call_args_list[0]
+    permission_func = args[0]
+
+    result = permission_func("principals")
+    assert result == "dummy resource"
+
+
 def test_permission_dependency_returns_requested_resource(mocker):
     """ If a user has a permission, the resource should be returned """
-    mocker.patch("fastapi_permissions.has_permission", return_value=True)
-    mocker.patch("fastapi_permissions.Depends")
-
-    from fastapi_permissions import Depends, permission_dependency_factory
+    mocker.patch.object(fp, "has_permission", return_value=True)
+    mocker.patch.object(fp, "Depends")
 
     # since the resulting permission function is wrapped in Depends()
     # we need to extract it from the mock
-    permission_dependency_factory(
+    fp.permission_dependency_factory(
         "view",
         dummy_resource_callable,
         "active_principals_func",
         "permisssion_exception",
     )
-    assert Depends.call_count == 2
-    args, kwargs = Depends.call_args_list[1]
+    assert fp.Depends.call_count == 2
+    args, kwargs = fp.Depends.call_args_list[1]
     permission_func = args[0]
 
-    result = permission_func()
-    assert result == Depends(dummy_resource_callable)
+    result = permission_func("resource", "principals")
+    assert result == "resource"
 
 
 def test_permission_dependency_raises_exception(mocker):
     """ If a user dosen't have a permission, a exception should be raised """
-    mocker.patch("fastapi_permissions.has_permission", return_value=False)
-    mocker.patch("fastapi_permissions.Depends")
-
-    from fastapi import HTTPException
-
-    from fastapi_permissions import (
-        Depends,
-        permission_exception,
-        permission_dependency_factory,
-    )
+    mocker.patch.object(fp, "has_permission", return_value=False)
+    mocker.patch.object(fp, "Depends")
 
     # since the resulting permission function is wrapped in Depends()
     # we need to extract it from the mock
-    permission_func = permission_dependency_factory(
+    permission_func = fp.permission_dependency_factory(
         "view",
         dummy_resource_callable,
         "active_principals_func",
-        permission_exception,
+        fp.permission_exception,
     )
-    assert Depends.call_count == 2
-    args, kwargs = Depends.call_args_list[1]
+    assert fp.Depends.call_count == 2
+    args, kwargs = fp.Depends.call_args_list[1]
     permission_func = args[0]
 
-    with pytest.raises(HTTPException):
-        permission_func()
+    with pytest.raises(fp.HTTPException):
+        permission_func("resource", "principals")
 
 
-@pytest.mark.parametrize(
-    "user",
-    [dummy_user_john, dummy_user_jane, dummy_user_alice, dummy_user_bob],
+@pytest.fixture(
+    scope="module", params=["acl", "class_attribute", "acl_cached_method"]
 )
+def resource_fixture(request, acl_fixture):
+    """ a resource providing the acl fixture in different ways
+
+    An acl defined as a tuple class attribute is precompiled and checked via
+    the permission index.
+    """
+    if request.param == "acl":
+        return acl_fixture
+
+    if request.param == "class_attribute":
+
+        class DummyResource:
+            __acl__ = tuple(acl_fixture)
+
+    else:
+
+        class DummyResource:
+            @fp.acl_cached
+            def __acl__(self):
+                return acl_fixture
+
+    return DummyResource()
+
+
+@pytest.mark.parametrize("principals,expected", permission_results)
 @pytest.mark.parametrize(
     "permission",
     ["view", "edit", "use", "create", "delete", "share", "copy", "nuke"],
 )
-def test_has_permission(user, permission, acl_fixture):
+def test_has_permission(principals, expected, permission, resource_fixture):
     """ tests the has_permission function """
-    from fastapi_permissions import has_permission
+    result = fp.has_permission(principals, permission, resource_fixture)
+
+    # a permission not mentioned in the acl is only granted through "All"
+    assert result == expected.get(permission, expected["permissions:*"])
 
-    result = has_permission(user.principals, permission, acl_fixture)
 
-    key = "permissions:*" if permission == "nuke" else permission
-    assert result == permission_results[user][key]
+@pytest.mark.parametrize("principals,expected", permission_results)
+def test_list_permissions(principals, expected, resource_fixture):
+    """ tests the list_permissions function """
+    result = fp.list_permissions(principals, resource_fixture)
+
+    assert result == expected
+
+
+def test_list_permissions_all_decides_later_permissions():
+    """ a matching "All" entry decides on permissions listed further down """
+    acl = [
+        (fp.Allow, "role:user", "view"),
+        (fp.Deny, "role:admin", fp.All),
+        (fp.Allow, "role:admin", "edit"),
+        (fp.Allow, fp.Everyone, ("share", fp.All)),
+    ]
+
+    result = fp.list_permissions(["role:admin", fp.Everyone], acl)
+
+    assert result == {
+        "view": False,
+        "permissions:*": False,
+        "edit": False,
+        "share": False,
+    }
 
 
 @pytest.mark.parametrize(
-    "user",
-    [dummy_user_john, dummy_user_jane, dummy_user_alice, dummy_user_bob],
+    "principals, expected",
+    [
+        ([fp.Everyone], True),
+        ([fp.Everyone, "role:banned"], False),
+        (["role:other"], False),
+    ],
 )
-def test_list_permissions(user, acl_fixture):
-    """ tests the list_permissions function """
-    from fastapi_permissions import list_permissions
+def test_has_permission_wildcard_only_class_acl(principals, expected):
+    """ an indexed acl with only "All" entries decides via the wildcard """
+
+    class DummyResource:
+        __acl__ = (
+            (fp.Deny, "role:banned", fp.All),
+            (fp.Allow, fp.Everyone, fp.All),
+        )
 
-    result = list_permissions(user.principals, acl_fixture)
+    assert fp.has_permission(principals, "view", DummyResource()) == expected
+
+
+@pytest.mark.parametrize(
+    "principals, expected",
+    [(["role:admin"], True), (["role:user"], False), ([fp.Everyone], False)],
+)
+def test_has_permission_unhashable_permission(principals, expected):
+    """ an unhashable permission is only granted by "All" for indexed acls """
+
+    class DummyResource:
+        __acl__ = (
+            (fp.Allow, "role:user", ("view", "edit")),
+            (fp.Allow, "role:admin", fp.All),
+        )
+
+    result = fp.has_permission(principals, ["view"], DummyResource())
+
+    assert result == expected
+
+
+@pytest.mark.parametrize("acl_type", [list, tuple])
+def test_has_permission_instance_acl_overrides_class_acl(acl_type):
+    """ an "__acl__" set on an instance takes precedence over the class one """
+
+    class DummyResource:
+        __acl__ = acl_type([(fp.Deny, fp.Everyone, "view")])
+
+    class DummyMethodResource:
+        def __acl__(self):
+            return acl_type([(fp.Deny, fp.Everyone, "view")])
+
+    for resource_class in (DummyResource, DummyMethodResource):
+        default = resource_class()
+        overridden = resource_class()
+        overridden.__acl__ = acl_type([(fp.Allow, fp.Everyone, "view")])
+
+        assert not fp.has_permission([fp.Everyone], "view", default)
+        assert fp.has_permission([fp.Everyone], "view", overridden)
+        assert fp.list_permissions([fp.Everyone], overridden) == {
+            "view": True
+        }
+
+
+def test_has_permission_uses_reassigned_class_acl():
+    """ a class level acl replaced after the first check is used """
+
+    class DummyResource:
+        __acl__ = ((fp.Deny, fp.Everyone, "view"),)
+
+    assert not fp.has_permission([fp.Everyone], "view", DummyResource())
+
+    DummyResource.__acl__ = ((fp.Allow, fp.Everyone, "view"),)
+    assert fp.has_permission([fp.Everyone], "view", DummyResource())
+    assert fp.list_permissions([fp.Everyone], DummyResource()) == {
+        "view": True
+    }
+
+    DummyResource.__acl__ = lambda self: [(fp.Deny, fp.Everyone, "view")]
+    assert not fp.has_permission([fp.Everyone], "view", DummyResource())
+
+
+def test_has_permission_list_acl_changed_after_warm_up(mocker):
+    """ a class level acl list extended after the route was defined is used """
+    mocker.patch.object(fp, "Depends")
+
+    class DummyResource:
+        __acl__ = [(fp.Deny, "role:banned", "view")]
+
+    fp.permission_dependency_factory(
+        "view",
+        DummyResource,
+        "active_principals_func",
+        "permisssion_exception",
+    )
+    DummyResource.__acl__.append((fp.Allow, fp.Everyone, "view"))
 
-    assert result == permission_results[user]
+    assert fp.has_permission([fp.Everyone], "view", DummyResource())
+    assert fp.list_permissions([fp.Everyone], DummyResource()) == {
+        "view": True
+    }
@@ -0,0 +1,188 @@
+""" tests for the precompiled acls and their caches
+
+These tests use the internals of the module on purpose: the caches must not
+change the results of the public functions, which is tested in
+test_permissions.py.
+"""
+
+import sys
+
+import fastapi_permissions as fp
+
+
+def dummy_resource_class(acl):
+    """ returns a new resource class with the acl as class attribute """
+    return type("DummyResource", (), {"__acl__": acl})
+
+
+def test_precompiled_acl():
+    """ test the precompiled form of an access controll list """
+    acl = (
+        (fp.Allow, "role:a", "view"),
+        (fp.Deny, "role:b", ("edit", "use")),
+        (fp.Allow, "role:c", fp.All),
+    )
+    resource_class = dummy_resource_class(acl)
+
+    compiled = fp._precompiled_acl(acl, resource_class)
+
+    assert compiled.entries == (
+        (True, "role:a", ("view",)),
+        (False, "role:b", ("edit", "use")),
+        (True, "role:c", fp.All),
+    )
+    assert compiled.index == {
+        "view": ((True, "role:a"), (True, "role:c")),
+        "edit": ((False, "role:b"), (True, "role:c")),
+        "use": ((False, "role:b"), (True, "role:c")),
+    }
+    assert compiled.wildcard == ((True, "role:c"),)
+    assert fp._precompiled_acl(acl, resource_class) is compiled
+
+
+class DummyPermissions:
+    def __contains__(self, permission):
+        return permission == "edit"
+
+
+def test_precompiled_acl_without_index():
+    """ test precompiling an acl with permissions that can't be indexed """
+    permissions = DummyPermissions()
+    acl = ((fp.Allow, "role:a", "view"), (fp.Allow, "role:b", permissions))
+
+    compiled = fp._precompiled_acl(acl, dummy_resource_class(acl))
+
+    assert compiled.entries == (
+        (True, "role:a", ("view",)),
+        (True, "role:b", permissions),
+    )
+    assert compiled.index is None
+    assert compiled.wildcard is None
+
+
+def test_precompiled_acl_unhashable_entries():
+    """ test that acls with unhashable entries are not precompiled """
+    acl = ((fp.Allow, "role:a", "view"), (fp.Allow, "role:b", ["edit"]))
+
+    assert fp._precompiled_acl(acl, dummy_resource_class(acl)) is None
+
+
+def test_precompiled_acl_only_for_class_attributes():
+    """ test that only the acl of the resource class is precompiled """
+    acl = ((fp.Allow, "role:a", "view"),)
+
+    assert fp._precompiled_acl(acl, dummy_resource_class(list(acl))) is None
+
+
+def test_has_permission_uses_index_of_class_acl(mocker):
+    """ test that an acl as tuple class attribute is checked via the index """
+    acl = (
+        (fp.Allow, "user:john", "view"),
+        (fp.Deny, "role:user", "create"),
+        (fp.Allow, "role:admin", fp.All),
+    )
+    resource_class = dummy_resource_class(acl)
+    compiled = fp._precompiled_acl(acl, resource_class)
+    mocker.patch.dict(compiled.index, {"view": ((False, "user:john"),)})
+
+    # the changed index decides, not the entries of the acl
+    assert not fp.has_permission(["user:john"], "view", resource_class())
+    assert fp.has_permission(["role:admin"], "nuke", resource_class())
+
+
+def test_precompiled_acl_interns_strings():
+    """ test that principals and permissions of precompiled acls are interned
+    """
+    principal = "".join(["user:", "bob"])
+    permission = "".join(["edit:", "all"])
+    acl = ((fp.Allow, principal, permission),)
+
+    compiled = fp._precompiled_acl(acl, dummy_resource_class(acl))
+    allowed, compiled_principal, permissions = compiled.entries[0]
+
+    assert compiled_principal is sys.intern(principal)
+    assert permissions[0] is sys.intern(permission)
+
+
+def test_precompiled_acl_cache_is_bounded(mocker):
+    """ test that the oldest precompiled acls are dropped """
+    mocker.patch.object(fp, "_COMPILED_ACL_CACHE_SIZE", 2)
+    mocker.patch.dict(fp._compiled_acl_cache, clear=True)
+    first, second, third = (((fp.Allow, "role:a", str(i)),) for i in range(3))
+
+    for acl in (first, second, first, third):
+        fp._precompiled_acl(acl, dummy_resource_class(acl))
+
+    assert list(fp._compiled_acl_cache) == [id(second), id(third)]
+
+
+def test_precompiled_acl_shared_for_same_content():
+    """ test that acls with the same entries share the compiled acl """
+    first = ((fp.Allow, fp.Everyone, "view"), (fp.Allow, "role:a", "edit"))
+    second = tuple(list(first))
+
+    assert first is not second
+    assert fp._precompiled_acl(
+        first, dummy_resource_class(first)
+    ) is fp._precompiled_acl(second, dummy_resource_class(second))
+
+
+def test_permission_dependency_factory_warms_up_acl_caches(mocker):
+    """ test that class level acls are prepared with the dependency """
+    mocker.patch.object(fp, "Depends")
+    mocker.patch.dict(fp._compiled_acl_cache, clear=True)
+    acl = ((fp.Allow, fp.Everyone, "view"),)
+    resource_class = dummy_resource_class(acl)
+
+    fp.permission_dependency_factory(
+        "view",
+        resource_class,
+        "active_principals_func",
+        "permisssion_exception",
+    )
+
+    assert list(fp._compiled_acl_cache) == [id(acl)]
+
+
+def test_list_permissions_caches_precompiled_acls(mocker):
+    """ test that results for acls defined as class attributes are cached """
+    mocker.patch.dict(fp._listed_permissions_cache, clear=True)
+    resource_class = dummy_resource_class(
+        ((fp.Allow, fp.Everyone, "view"), (fp.Allow, "role:admin", "edit"))
+    )
+    spy = mocker.spy(fp, "_list_permissions")
+
+    first = fp.list_permissions([fp.Everyone], resource_class())
+    first["view"] = "changed by caller"
+    second = fp.list_permissions({fp.Everyone}, resource_class())
+    admin = fp.list_permissions([fp.Everyone, "role:admin"], resource_class())
+
+    assert second == {"view": True, "edit": False}
+    assert admin == {"view": True, "edit": True}
+    assert spy.call_count == 2
+
+
+def test_list_permissions_cache_follows_reassigned_acls(mocker):
+    """ test that cached results are not used for a replaced class acl """
+    mocker.patch.dict(fp._listed_permissions_cache, clear=True)
+    resource_class = dummy_resource_class(((fp.Allow, fp.Everyone, "view"),))
+
+    before = fp.list_permissions([fp.Everyone], resource_class())
+    resource_class.__acl__ = ((fp.Deny, fp.Everyone, "view"),)
+    after = fp.list_permissions([fp.Everyone], resource_class())
+
+    assert before == {"view": True}
+    assert after == {"view": False}
+
+
+def test_list_permissions_cache_is_bounded(mocker):
+    """ test that the oldest listed permissions are dropped """
+    mocker.patch.object(fp, "_LISTED_PERMISSIONS_CACHE_SIZE", 2)
+    mocker.patch.dict(fp._listed_permissions_cache, clear=True)
+    resource = dummy_resource_class(((fp.Allow, fp.Everyone, "view"),))()
+
+    for principal in ("role:a", "role:b", "role:a", "role:c"):
+        fp.list_permissions([principal], resource)
+
+    principals = [set(key[0]) for key in fp._listed_permissions_cache]
+    assert principals == [{"role:b"}, {"role:c"}]
@@ -1,58 +1,210 @@
 """ tests for the utility functions """
 
-import pytest
+from types import SimpleNamespace
 
+import pytest
 
-class DummyUser:
-    def __init__(self, principals):
-        self.principals = principals
+from fastapi_permissions import (
+    acl_cached,
+    is_like_list,
+    normalize_acl,
+    as_principals_set,
+)
 
 
 class DummyResource:
+    __slots__ = ("__acl__",)
+
     def __init__(self, acl):
         self.__acl__ = acl
 
 
+# the dummy resources are never changed by the tests, so they are shared
+ACL_ATTRIBUTE_RESOURCE = DummyResource("acl definition")
+ACL_METHOD_RESOURCE = DummyResource(lambda: "acl definition")
+
+
+class DummyList(list):
+    __acl__ = "acl definition"
+
+
 @pytest.mark.parametrize("iterable", [[], (), {}, set()])
 def test_normalize_acl_list_provided(iterable):
     """ test for acl provided directly as an iterable """
-    from fastapi_permissions import normalize_acl
-
     assert normalize_acl(iterable) == iterable
 
 
-def test_normalize_acl_without_acl_attribute():
-    """ test for resource without __acl__ attribute """
-    from fastapi_permissions import normalize_acl
+@pytest.mark.parametrize(
+    "resource, expected",
+    [
+        ("without __acl__", []),
+        (SimpleNamespace(__acl__="acl definition"), "acl definition"),
+        (ACL_ATTRIBUTE_RESOURCE, "acl definition"),
+        (ACL_METHOD_RESOURCE, "acl definition"),
+        (DummyList(), "acl definition"),
+    ],
+    ids=[
+        "without_acl",
+        "instance_attribute",
+        "acl_attribute",
+        "acl_method",
+        "acl_precedence",
+    ],
+)
+def test_normalize_acl(resource, expected):
+    """ test for resources with and without an __acl__ attribute
 
-    assert normalize_acl("without __acl__") == []
+    An __acl__ attribute of an iterable resource takes precedence.
+    """
+    assert normalize_acl(resource) == expected
 
 
-def test_normalize_acl_with_acl_attribute():
-    """ test for resource with an __acl__ attribute """
-    from fastapi_permissions import normalize_acl
+class DummyString(str):
+    pass
 
-    resource = DummyResource("acl definition")
 
-    assert normalize_acl(resource) == "acl definition"
+class DummyIterable:
+    def __iter__(self):
+        return iter([])
 
 
-def test_normalize_acl_with_acl_method():
-    """ test for resource with an __acl__ attribute """
-    from fastapi_permissions import normalize_acl
+@pytest.mark.parametrize(
+    "something, expected",
+    [
+        ([], True),
+        ((), True),
+        (set(), True),
+        (frozenset(), True),
+        ({}, True),
+        (DummyIterable(), True),
+        ("string", False),
+        (DummyString("string"), False),
+        (None, False),
+        (1, False),
+    ],
+)
+def test_is_like_list(something, expected):
+    """ test if something is iterable but not a string """
+    assert is_like_list(something) == expected
 
-    resource = DummyResource(lambda: "acl definition")
 
-    assert normalize_acl(resource) == "acl definition"
+@pytest.mark.parametrize("principals", [set(), frozenset()])
+def test_as_principals_set_keeps_sets(principals):
+    """ test that sets of principals are used as they are """
+    assert as_principals_set(principals) is principals
+
+
+@pytest.mark.parametrize("principals", [[], (), ["a", "b"], ("a", "a")])
+def test_as_principals_set_converts_iterables(principals):
+    """ test that other iterables are converted to a frozenset """
+    result = as_principals_set(principals)
+
+    assert isinstance(result, frozenset)
+    assert result == frozenset(principals)
+
+
+def test_normalize_acl_with_acl_class_method():
+    """ test for resource class with an __acl__ method """
+
+    class DummyOwned:
+        def __init__(self, owner):
+            self.owner = owner
+
+        def __acl__(self):
+            return f"acl for {self.owner}"
+
+    assert normalize_acl(DummyOwned("alice")) == "acl for alice"
+    assert normalize_acl(DummyOwned("bob")) == "acl for bob"
+
+
+def test_normalize_acl_with_acl_property():
+    """ test for resource class with an __acl__ property """
+
+    class DummyOwned:
+        def __init__(self, owner):
+            self.owner = owner
+
+        @property
+        def __acl__(self):
+            return f"acl for {self.owner}"
+
+    assert normalize_acl(DummyOwned("alice")) == "acl for alice"
+    assert normalize_acl(DummyOwned("bob")) == "acl for bob"
+
+
+def test_normalize_acl_class_acl_added_later():
+    """ test that an acl added to a class after the first lookup is found """
+
+    class DummySlotted:
+        __slots__ = ()
+
+    assert normalize_acl(DummySlotted()) == []
+
+    DummySlotted.__acl__ = "acl definition"
+    assert normalize_acl(DummySlotted()) == "acl definition"
+
+
+def test_acl_cached_computes_acl_once_per_instance(mocker):
+    """ test that a decorated __acl__ method is called once per instance """
+    calls = mocker.Mock()
+
+    class DummyOwned:
+        def __init__(self, owner):
+            self.owner = owner
+
+        @acl_cached
+        def __acl__(self):
+            calls(self.owner)
+            return [f"acl for {self.owner}"]
+
+    alice = DummyOwned("alice")
+    bob = DummyOwned("bob")
+
+    assert normalize_acl(alice) == ["acl for alice"]
+    assert normalize_acl(alice) is normalize_acl(alice)
+    assert normalize_acl(bob) == ["acl for bob"]
+    assert alice.__acl__ is normalize_acl(alice)
+    assert calls.call_args_list == [mocker.call("alice"), mocker.call("bob")]
+
+
+def test_acl_cached_forgets_deleted_instances():
+    """ test that the cached acl is removed with the instance """
+
+    class DummyOwned:
+        @acl_cached
+        def __acl__(self):
+            return ["acl definition"]
+
+    resource = DummyOwned()
+    assert normalize_acl(resource) == ["acl definition"]
+    assert len(DummyOwned.__acl__.cache) == 1
+
+    del resource
+    assert len(DummyOwned.__acl__.cache) == 0
+
+
+def test_acl_cached_without_weak_references():
+    """ test that instances without weak reference support still work """
+
+    class DummySlotted:
+        __slots__ = ()
+
+        @acl_cached
+        def __acl__(self):
+            return ["acl definition"]
+
+    assert normalize_acl(DummySlotted()) == ["acl definition"]
+    assert len(DummySlotted.__acl__.cache) == 0
 
 
-def test_normalize_acl_attribute_takes_precedence():
-    """ test for resource with an __acl__ attribute that are also iterables """
-    from fastapi_permissions import normalize_acl
+def test_normalize_acl_iterable_class_acl_added_later():
+    """ test that an acl added to an iterable resource class is found """
 
-    class DummyList(list):
-        __acl__ = "acl definition"
+    class DummyAcl(tuple):
+        __slots__ = ()
 
-    resource = DummyList()
+    resource = DummyAcl([("Allow", "role:a", "view")])
+    assert normalize_acl(resource) is resource
 
+    DummyAcl.__acl__ = "acl definition"
     assert normalize_acl(resource) == "acl definition"